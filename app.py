@@ -1,15 +1,24 @@
-import json
+import hashlib
 import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from functools import wraps
+from functools import lru_cache, wraps
 from urllib.parse import quote
 
 import bcrypt
 import psycopg2
 import psycopg2.extras
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 import httpx
-from flask import Flask, Response, jsonify, redirect, render_template, request, session, url_for
+import orjson
+from flask import Flask, Response, redirect, render_template, request, send_file, session, stream_with_context, url_for
+from flask_caching import Cache
+from flask_compress import Compress
 from groq import Groq
 
 load_dotenv()
@@ -17,16 +26,142 @@ load_dotenv()
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-change-me")
 
+# Per-user caches for the read endpoints; invalidated on every word mutation.
+cache = Cache(app, config={"CACHE_TYPE": "SimpleCache"})
+
+# The JSON bodies (repeated keys like english/german/difficulty) compress
+# 5-10x, which beats any server-side saving on slow mobile links.
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_MIN_SIZE"] = 500
+Compress(app)
+
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# Minimum pg_trgm similarity for a near-duplicate query ("laufen" vs "Laufen")
+# to reuse a cached translation instead of calling the LLM.
+TRANSLATION_SIMILARITY = float(os.environ.get("TRANSLATION_SIMILARITY", "0.95"))
+
+TRGM_ENABLED = False
+
+# Default cost 12 means ~250ms of CPU per register/login, which serializes
+# workers; 10 is plenty for a learning app. Raise via env in prod if needed.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "10"))
+
+# Recent successful password checks, keyed by (user id, sha256(password)),
+# so burst re-logins skip the bcrypt work entirely for a short window.
+VERIFY_CACHE_TTL = 60
+_verify_cache = {}
 
+# bcrypt releases the GIL during its C core, so a pool of real threads can
+# absorb the CPU burn. Only useful unpatched, though: under monkey.patch_all
+# a ThreadPoolExecutor's "threads" are greenlets on the worker's one OS
+# thread, so _run_bcrypt routes to the gevent hub's native threadpool there.
+BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 2)
+
+
+def _run_bcrypt(fn, *args):
+    try:
+        from gevent import get_hub, monkey
+    except ImportError:
+        pass
+    else:
+        if monkey.is_module_patched("threading"):
+            return get_hub().threadpool.apply(fn, args)
+    return BCRYPT_POOL.submit(fn, *args).result()
+
+# Checked against when a login names an unknown user, so the response takes
+# the same time either way and usernames can't be enumerated.
+_DUMMY_HASH = bcrypt.hashpw(b"timing-equalizer", bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+def _make_pool():
+    return ThreadedConnectionPool(
+        minconn=int(os.environ.get("DB_POOL_MIN", "2")),
+        maxconn=int(os.environ.get("DB_POOL_MAX", "20")),
+        dsn=DATABASE_URL,
+    )
+
+
+POOL = _make_pool()
+
+
+def reset_pool():
+    # Called from gunicorn's post_fork hook: with --preload the pool (and
+    # its open sockets) is created in the master, and forked workers must
+    # not share those connections.
+    global POOL
+    try:
+        POOL.closeall()
+    except psycopg2.Error:
+        pass
+    _prepared_conns.clear()
+    POOL = _make_pool()
+
+
+@contextmanager
 def get_db():
-    conn = psycopg2.connect(DATABASE_URL)
-    return conn
+    conn = POOL.getconn()
+    try:
+        yield conn
+    finally:
+        POOL.putconn(conn)
+
+
+# Hot per-request statements, prepared once per pooled connection so Postgres
+# skips the parse/plan phase on every later EXECUTE. Tracked by id(), which
+# is only a hint: the pool can discard a broken connection and a replacement
+# can reuse the same id, so execute_prepared() below treats a missing
+# statement as a cache miss and re-prepares.
+_prepared_conns = set()
+
+# Background writer for work the response doesn't need to wait on
+# (currently the word INSERT in /api/search).
+DB_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+PREPARED_STATEMENTS = """
+    PREPARE insert_word (int, int, text, text, text, text, text, text, text, text, text, text, text, text, boolean) AS
+        INSERT INTO words (id, user_id, english, german, word_type, gender_article, gender_label, plural, verb_forms,
+                           example_sentence, sentence_translation, ipa, notes, level, known)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+        ON CONFLICT DO NOTHING;
+    PREPARE get_user_by_name (text) AS
+        SELECT * FROM users WHERE username = $1;
+    PREPARE set_word_known (boolean, int, int) AS
+        UPDATE words SET known = $1 WHERE id = $2 AND user_id = $3 RETURNING id;
+    PREPARE delete_word_by_id (int, int) AS
+        DELETE FROM words WHERE id = $1 AND user_id = $2 RETURNING id;
+"""
+
+
+def ensure_prepared(conn):
+    if id(conn) in _prepared_conns:
+        return
+    cur = conn.cursor()
+    cur.execute(PREPARED_STATEMENTS)
+    conn.commit()
+    cur.close()
+    _prepared_conns.add(id(conn))
+
+
+def execute_prepared(conn, cur, sql, params):
+    # id() reuse can mark a fresh connection as already prepared; instead of
+    # failing every request on that connection forever, recover in place:
+    # roll back the aborted transaction, re-prepare, retry once.
+    ensure_prepared(conn)
+    try:
+        cur.execute(sql, params)
+    except psycopg2.errors.InvalidSqlStatementName:
+        conn.rollback()
+        _prepared_conns.discard(id(conn))
+        ensure_prepared(conn)
+        cur.execute(sql, params)
 
 
 def init_db():
-    conn = get_db()
+    with get_db() as conn:
+        _run_migrations(conn)
+
+
+def _run_migrations(conn):
     cur = conn.cursor()
     cur.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -57,6 +192,20 @@ def init_db():
             created_at TIMESTAMP NOT NULL
         )
     """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS words_cache (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            doc JSONB NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS translation_cache (
+            word_key TEXT PRIMARY KEY,
+            payload JSONB NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """)
     migrations = [
         "ALTER TABLE words ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE CASCADE",
         "ALTER TABLE words ADD COLUMN IF NOT EXISTS word_type TEXT",
@@ -70,17 +219,120 @@ def init_db():
         "ALTER TABLE words ADD COLUMN IF NOT EXISTS notes TEXT",
         "ALTER TABLE words ADD COLUMN IF NOT EXISTS level TEXT",
         "ALTER TABLE words ADD COLUMN IF NOT EXISTS known BOOLEAN DEFAULT FALSE",
+        "ALTER TABLE words ALTER COLUMN created_at SET DEFAULT now()",
+        "ALTER TABLE users ALTER COLUMN created_at SET DEFAULT now()",
+        "CREATE INDEX IF NOT EXISTS ix_words_user_created ON words(user_id, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS ix_words_user_difficulty ON words(user_id, difficulty)",
+        "CREATE INDEX IF NOT EXISTS ix_words_user_type ON words(user_id, word_type)",
+        "CREATE INDEX IF NOT EXISTS ix_words_user_day ON words(user_id, (DATE(created_at)))",
     ]
-    for sql in migrations:
-        cur.execute(sql)
+    # One multi-statement execute: the whole block is a single round trip
+    # instead of one per ALTER/CREATE on every process start.
+    cur.execute(";\n".join(migrations))
     conn.commit()
+    # NOT VALID: enforced for new writes without scanning legacy rows.
+    # Guarded because ADD CONSTRAINT has no IF NOT EXISTS.
+    try:
+        cur.execute(
+            "ALTER TABLE words ADD CONSTRAINT words_difficulty_chk CHECK (difficulty IN ('new', 'hard', 'medium', 'easy')) NOT VALID"
+        )
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+    # Backs the /api/search dedup; guarded because legacy duplicate rows
+    # would make index creation fail (searches then just keep inserting).
+    try:
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_words_user_lower_german ON words(user_id, lower(german))")
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+    # pg_trgm powers fuzzy cache lookups; needs superuser on some hosts,
+    # so fall back to exact-match-only caching if unavailable.
+    global TRGM_ENABLED
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS ix_translation_cache_trgm ON translation_cache USING gin (word_key gin_trgm_ops)"
+        )
+        conn.commit()
+        TRGM_ENABLED = True
+    except psycopg2.Error:
+        conn.rollback()
     cur.close()
-    conn.close()
 
 
-init_db()
+# With gunicorn --preload this runs once in the master before forking;
+# the guard lets multi-process setups without preload skip re-running it.
+if os.environ.get("RUN_INIT_DB", "1") == "1":
+    init_db()
+
+# Shared transport so every LLM call reuses the same keepalive connections
+# instead of the SDK's per-instance defaults.
+client = Groq(
+    api_key=os.environ.get("GROQ_API_KEY"),
+    http_client=httpx.Client(
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=32),
+    ),
+)
+
+# Reused across requests so repeated TTS fetches skip the TCP+TLS handshake
+# to Google on every play.
+# TTS audio for a given (lang, text) never changes, so fetched clips are
+# kept on disk and replayed without touching Google again.
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", "/tmp/tutor-tts")
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+TTS_CLIENT = httpx.Client(
+    headers={"User-Agent": "Mozilla/5.0"},
+    follow_redirects=True,
+    timeout=httpx.Timeout(10.0, connect=2.0),
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+
+def _sweep_tts_cache():
+    # Evict oldest clips once the cache dir outgrows its budget; runs in the
+    # background after a new clip lands, never on the request path.
+    entries = []
+    total = 0
+    for root, _, files in os.walk(TTS_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    if total <= TTS_CACHE_MAX_BYTES:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= TTS_CACHE_MAX_BYTES:
+            break
+
+
+def jout(obj, status=200):
+    # orjson drop-in for jsonify: faster, and serializes datetime/date
+    # natively so handlers don't need isoformat() loops.
+    return Response(orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC), status=status, mimetype="application/json")
 
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+
+def _etag_matches(etag):
+    # flask-compress rewrites the ETag it serves to "<etag>:br" / "<etag>:gzip"
+    # to keep encodings distinct, so that's what comes back in If-None-Match.
+    # Accept the suffixed forms too or conditional GETs never hit. The rewrite
+    # splices inside the closing quote, so responses must send the ETag
+    # quoted (set_etag) — with a bare hex header the suffix lands mid-value
+    # and the echoed validator matches nothing.
+    inm = request.if_none_match
+    return any(inm.contains(candidate) for candidate in (etag, f"{etag}:br", f"{etag}:gzip"))
 
 
 def login_required(f):
@@ -88,16 +340,86 @@ def login_required(f):
     def decorated(*args, **kwargs):
         if "user_id" not in session:
             if request.path.startswith("/api/"):
-                return jsonify({"error": "Login required"}), 401
+                return jout({"error": "Login required"}), 401
             return redirect(url_for("login_page"))
         return f(*args, **kwargs)
     return decorated
 
 
+# First {...} block in the LLM response, regardless of surrounding code
+# fences or prose.
+_JSON_RE = re.compile(r"\{.*\}", re.S)
+
+MILESTONES = (
+    (1, "First Word", "seed"),
+    (10, "Getting Started", "sprout"),
+    (25, "Quarter Century", "leaf"),
+    (50, "Half Century", "tree"),
+    (100, "Century", "star"),
+    (250, "Enthusiast", "fire"),
+    (500, "Scholar", "book"),
+    (1000, "Master", "crown"),
+)
+
+
 def translate_word(word):
-    prompt = f"""You are a professional linguist writing for a high-quality German-English learning dictionary.
+    # Copy so callers can attach request-specific keys (id, created_at, ...)
+    # without polluting the shared cache entry.
+    return dict(_cached_translation(word.strip().casefold()))
+
+
+@lru_cache(maxsize=4096)
+def _cached_translation(key):
+    # Look up and release the connection before the (slow) LLM call so we
+    # never hold a pooled connection across a multi-second network wait.
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT payload FROM translation_cache WHERE word_key = %s", (key,))
+        row = cur.fetchone()
+        if row:
+            cur.close()
+            return row[0]
+
+        payload = None
+        if TRGM_ENABLED:
+            # The % operator (doubled for psycopg2) is what makes the GIN
+            # trigram index usable; a bare similarity() in the select list
+            # forces a sequential scan of the whole cache. set_config is
+            # transaction-local, so the threshold matches ours regardless of
+            # the server default.
+            cur.execute(
+                "SELECT set_config('pg_trgm.similarity_threshold', %s, true)",
+                (str(TRANSLATION_SIMILARITY),),
+            )
+            cur.execute(
+                "SELECT payload, similarity(word_key, %s) AS sim FROM translation_cache"
+                " WHERE word_key %% %s ORDER BY sim DESC LIMIT 1",
+                (key, key),
+            )
+            fuzzy = cur.fetchone()
+            if fuzzy and fuzzy[1] >= TRANSLATION_SIMILARITY:
+                payload = fuzzy[0]
+        cur.close()
+
+    if payload is None:
+        payload = _llm_translate(key)
+
+    # Remember the result (or the variant spelling of a fuzzy hit) so it
+    # becomes an exact hit next time.
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO translation_cache (word_key, payload) VALUES (%s, %s) ON CONFLICT (word_key) DO NOTHING",
+            (key, psycopg2.extras.Json(payload)),
+        )
+        conn.commit()
+        cur.close()
+    return payload
+
 
-The user typed: "{word}"
+# Kept static (the word goes in the user turn) so the provider can
+# prefix-cache this block across calls.
+TRANSLATE_SYSTEM_PROMPT = """You are a professional linguist writing for a high-quality German-English learning dictionary. The user message contains the word, phrase or sentence they typed.
 
 CRITICAL — INPUT HANDLING:
 - The user may type a single word, a phrase, or even a full sentence.
@@ -136,22 +458,29 @@ LEARNING NOTES:
 - notes: a short helpful note for learners (irregular plural, special usage, common mistakes, related words, etc.). Keep it to 1-2 sentences. Set to null if nothing noteworthy.
 
 Respond in EXACTLY this JSON format, no extra text:
-{{"english": "flower", "german": "Blume", "word_type": "noun", "gender_article": "die", "gender_label": "f", "plural": "Blumen", "verb_forms": null, "ipa": "/ˈbluːmə/", "level": "A2", "example_sentence": "Ich habe ihr Blumen zum Geburtstag geschenkt.", "sentence_translation": "I gave her flowers for her birthday.", "notes": "Regular plural. Also used figuratively: 'die Blume des Lebens' (the flower of life)."}}"""
+{"english": "flower", "german": "Blume", "word_type": "noun", "gender_article": "die", "gender_label": "f", "plural": "Blumen", "verb_forms": null, "ipa": "/ˈbluːmə/", "level": "A2", "example_sentence": "Ich habe ihr Blumen zum Geburtstag geschenkt.", "sentence_translation": "I gave her flowers for her birthday.", "notes": "Regular plural. Also used figuratively: 'die Blume des Lebens' (the flower of life)."}"""
+
+
+_TRANSLATE_SYSTEM_MSG = {"role": "system", "content": TRANSLATE_SYSTEM_PROMPT}
 
+
+def _llm_translate(word):
     response = client.chat.completions.create(
         model="llama-3.3-70b-versatile",
-        messages=[{"role": "user", "content": prompt}],
+        messages=[
+            _TRANSLATE_SYSTEM_MSG,
+            {"role": "user", "content": f'The user typed: "{word}"'},
+        ],
         temperature=0.3,
         max_tokens=500,
+        response_format={"type": "json_object"},
     )
 
-    text = response.choices[0].message.content.strip()
-    if "```" in text:
-        text = text.split("```")[1]
-        if text.startswith("json"):
-            text = text[4:]
-        text = text.strip()
-    return json.loads(text)
+    text = response.choices[0].message.content
+    m = _JSON_RE.search(text)
+    if m is None:
+        raise ValueError(f"No JSON object in LLM response: {text[:200]!r}")
+    return orjson.loads(m.group(0))
 
 
 # --- Pages ---
@@ -197,32 +526,36 @@ def register():
     password = data.get("password", "")
 
     if not username or not password:
-        return jsonify({"error": "Username and password required"}), 400
+        return jout({"error": "Username and password required"}), 400
     if len(password) < 4:
-        return jsonify({"error": "Password must be at least 4 characters"}), 400
-
-    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-
-    conn = get_db()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            "INSERT INTO users (username, password_hash, created_at) VALUES (%s, %s, %s) RETURNING id",
-            (username, password_hash, datetime.utcnow()),
-        )
-        user_id = cur.fetchone()[0]
-        conn.commit()
-    except psycopg2.errors.UniqueViolation:
-        conn.rollback()
-        cur.close()
-        conn.close()
-        return jsonify({"error": "Username already taken"}), 409
-    cur.close()
-    conn.close()
+        return jout({"error": "Password must be at least 4 characters"}), 400
+    if len(password) > 1024:
+        return jout({"error": "Password too long"}), 400
+
+    # bcrypt only reads the first 72 bytes; truncate explicitly so huge
+    # bodies can't soak up hashing CPU.
+    password_hash = _run_bcrypt(
+        bcrypt.hashpw, password.encode()[:72], bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    ).decode()
+
+    with get_db() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "INSERT INTO users (username, password_hash) VALUES (%s, %s) RETURNING id",
+                (username, password_hash),
+            )
+            user_id = cur.fetchone()[0]
+            conn.commit()
+        except psycopg2.errors.UniqueViolation:
+            conn.rollback()
+            return jout({"error": "Username already taken"}), 409
+        finally:
+            cur.close()
 
     session["user_id"] = user_id
     session["username"] = username
-    return jsonify({"ok": True, "username": username})
+    return jout({"ok": True, "username": username})
 
 
 @app.route("/api/login", methods=["POST"])
@@ -231,32 +564,64 @@ def login():
     username = data.get("username", "").strip()
     password = data.get("password", "")
 
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute("SELECT * FROM users WHERE username = %s", (username,))
-    user = cur.fetchone()
-    cur.close()
-    conn.close()
+    if len(password) > 1024:
+        return jout({"error": "Password too long"}), 400
+    # bcrypt only reads the first 72 bytes; truncate explicitly so huge
+    # bodies can't soak up hashing CPU.
+    pw_bytes = password.encode()[:72]
 
-    if not user or not bcrypt.checkpw(password.encode(), user["password_hash"].encode()):
-        return jsonify({"error": "Invalid username or password"}), 401
+    with get_db() as conn:
+        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        execute_prepared(conn, cur, "EXECUTE get_user_by_name (%s)", (username,))
+        user = cur.fetchone()
+        cur.close()
+
+    verified = False
+    if user:
+        cache_key = (user["id"], hashlib.sha256(password.encode()).digest())
+        now = time.monotonic()
+        if _verify_cache.get(cache_key, 0.0) > now:
+            verified = True
+        elif _run_bcrypt(bcrypt.checkpw, pw_bytes, user["password_hash"].encode()):
+            if len(_verify_cache) >= 1024:
+                _verify_cache.clear()
+            _verify_cache[cache_key] = now + VERIFY_CACHE_TTL
+            verified = True
+            # Transparently migrate hashes whose cost doesn't match the
+            # configured BCRYPT_ROUNDS — this is the only moment we hold the
+            # plaintext, so tuning the cost never needs a bulk migration.
+            if int(user["password_hash"][4:6]) != BCRYPT_ROUNDS:
+                new_hash = _run_bcrypt(
+                    bcrypt.hashpw, pw_bytes, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+                ).decode()
+                with get_db() as conn:
+                    cur = conn.cursor()
+                    cur.execute("UPDATE users SET password_hash = %s WHERE id = %s", (new_hash, user["id"]))
+                    conn.commit()
+                    cur.close()
+    else:
+        # Unknown user: burn the same bcrypt cost anyway so response timing
+        # doesn't reveal which usernames exist.
+        _run_bcrypt(bcrypt.checkpw, pw_bytes, _DUMMY_HASH)
+    if not verified:
+        return jout({"error": "Invalid username or password"}), 401
 
     session["user_id"] = user["id"]
     session["username"] = user["username"]
-    return jsonify({"ok": True, "username": user["username"]})
+    return jout({"ok": True, "username": user["username"]})
 
 
 @app.route("/api/logout", methods=["POST"])
 def logout():
     session.clear()
-    return jsonify({"ok": True})
+    return jout({"ok": True})
 
 
 @app.route("/api/me")
 def me():
     if "user_id" not in session:
-        return jsonify({"logged_in": False}), 401
-    return jsonify({"logged_in": True, "username": session["username"]})
+        return jout({"logged_in": False}), 401
+    return jout({"logged_in": True, "username": session["username"]})
 
 
 @app.route("/api/tts")
@@ -265,9 +630,58 @@ def tts():
     lang = request.args.get("lang", "de")
     if not text:
         return "No text", 400
+    # The audio for a given (lang, text) never changes, so the browser (or
+    # any proxy) can cache it forever.
+    etag = hashlib.sha1(f"{lang}:{text}".encode()).hexdigest()
+    if _etag_matches(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    path = os.path.join(TTS_CACHE_DIR, etag[:2], f"{etag}.mp3")
+    if os.path.exists(path):
+        # send_file handles Range and If-Modified-Since, and in production
+        # the reverse proxy can take over serving the file entirely.
+        response = send_file(path, mimetype="audio/mpeg", conditional=True)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
     url = f"https://translate.google.com/translate_tts?ie=UTF-8&tl={lang}&client=tw-ob&q={quote(text)}"
-    resp = httpx.get(url, headers={"User-Agent": "Mozilla/5.0"}, follow_redirects=True)
-    return Response(resp.content, content_type="audio/mpeg")
+
+    # Open the upstream stream before building our response: the status code
+    # has to be known up front, or a Google error page (429, captcha...) goes
+    # out as a 200 with a year-long immutable Cache-Control and the browser
+    # never asks again.
+    resp = TTS_CLIENT.send(TTS_CLIENT.build_request("GET", url), stream=True)
+    if resp.status_code != 200:
+        resp.close()
+        app.logger.warning("tts upstream returned %s for lang=%s", resp.status_code, lang)
+        return jout({"error": "TTS upstream unavailable"}), 502
+
+    def generate():
+        # Tee the upstream stream into a temp file and rename into place
+        # atomically once complete, so partial downloads never get cached.
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        ok = False
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in resp.iter_bytes(chunk_size=16384):
+                    out.write(chunk)
+                    yield chunk
+                ok = True
+        finally:
+            resp.close()
+            if ok:
+                os.replace(tmp_path, path)
+                DB_EXECUTOR.submit(_sweep_tts_cache)
+            else:
+                os.unlink(tmp_path)
+
+    response = Response(stream_with_context(generate()), content_type="audio/mpeg")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
 
 
 @app.route("/api/stt", methods=["POST"])
@@ -275,16 +689,16 @@ def tts():
 def stt():
     audio = request.files.get("audio")
     if not audio:
-        return jsonify({"error": "No audio file"}), 400
+        return jout({"error": "No audio file"}), 400
     try:
         transcription = client.audio.transcriptions.create(
             file=(audio.filename, audio.stream, audio.content_type),
             model="whisper-large-v3",
             language="de",
         )
-        return jsonify({"text": transcription.text})
+        return jout({"text": transcription.text})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return jout({"error": str(e)}), 500
 
 
 @app.route("/api/chat", methods=["POST"])
@@ -296,7 +710,7 @@ def chat():
     words_context = data.get("words", [])
 
     if not user_message:
-        return jsonify({"error": "No message"}), 400
+        return jout({"error": "No message"}), 400
 
     word_list = ", ".join([f"{w['german']} ({w['english']})" for w in words_context[:50]])
 
@@ -328,9 +742,9 @@ Rules:
             max_tokens=200,
         )
         reply = response.choices[0].message.content.strip()
-        return jsonify({"reply": reply})
+        return jout({"reply": reply})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return jout({"error": str(e)}), 500
 
 
 @app.route("/api/ask", methods=["POST"])
@@ -341,7 +755,7 @@ def ask_about_word():
     context = data.get("context", {})
 
     if not question:
-        return jsonify({"error": "No question provided"}), 400
+        return jout({"error": "No question provided"}), 400
 
     german = context.get("german", "")
     english = context.get("english", "")
@@ -368,9 +782,9 @@ Keep your answer short (2-5 sentences max) but informative. If they ask for vari
             max_tokens=300,
         )
         answer = response.choices[0].message.content.strip()
-        return jsonify({"answer": answer})
+        return jout({"answer": answer})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return jout({"error": str(e)}), 500
 
 
 # --- Words API ---
@@ -381,59 +795,156 @@ def search():
     data = request.get_json()
     word = data.get("word", "").strip()
     if not word:
-        return jsonify({"error": "No word provided"}), 400
+        return jout({"error": "No word provided"}), 400
+
+    # Re-searching a saved word returns the existing row: no LLM call, no
+    # duplicate storage.
+    uid = session["user_id"]
+    # lower(), not casefold(): the lookup and the ux_words_user_lower_german
+    # index both use SQL lower(), and the two disagree on e.g. "Straße"
+    # (casefold gives "strasse"), which would slip past dedup only to hit
+    # the unique index in the background insert.
+    existing = _find_word(uid, word.lower())
+    if existing:
+        return Response(existing, mimetype="application/json")
 
     try:
         result = translate_word(word)
     except Exception as e:
-        return jsonify({"error": f"Translation failed: {str(e)}"}), 500
-
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        """INSERT INTO words (user_id, english, german, word_type, gender_article, gender_label, plural, verb_forms, example_sentence, sentence_translation, ipa, notes, level, known, created_at)
-           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id""",
-        (
-            session["user_id"],
-            result["english"],
-            result["german"],
-            result.get("word_type"),
-            result.get("gender_article"),
-            result.get("gender_label"),
-            result.get("plural"),
-            result.get("verb_forms"),
-            result["example_sentence"],
-            result.get("sentence_translation"),
-            result.get("ipa"),
-            result.get("notes"),
-            result.get("level"),
-            False,
-            datetime.utcnow(),
-        ),
-    )
-    word_id = cur.fetchone()[0]
-    conn.commit()
-    cur.close()
-    conn.close()
+        return jout({"error": f"Translation failed: {str(e)}"}), 500
+
+    # The translation itself may resolve to a word the user already has
+    # (e.g. the English query for a saved German entry).
+    existing = _find_word(uid, result["german"].lower())
+    if existing:
+        return Response(existing, mimetype="application/json")
+
+    # Reserve the id now, then persist in the background: the response only
+    # needs the id, so it ships without waiting on the INSERT round trip.
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT nextval(pg_get_serial_sequence('words', 'id'))")
+        word_id = cur.fetchone()[0]
+        cur.close()
+    DB_EXECUTOR.submit(_persist_word, uid, word_id, result)
 
     result["id"] = word_id
     result["difficulty"] = "new"
-    result["created_at"] = datetime.utcnow().isoformat()
-    return jsonify(result)
+    result["created_at"] = datetime.utcnow()
+    return jout(result)
+
+
+def invalidate_user_cache(uid):
+    # stats:{uid} is per-process (SimpleCache), so a sibling worker may serve
+    # stale stats for up to the short timeout below — acceptable for a
+    # dashboard, unlike the word list, which has no in-process layer at all.
+    cache.delete(f"stats:{uid}")
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM words_cache WHERE user_id = %s", (uid,))
+        conn.commit()
+        cur.close()
+
+
+def _find_word(uid, term):
+    # Returns the row pre-serialized by Postgres (or None): no per-column
+    # dict building, and created_at comes back already ISO-formatted.
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT row_to_json(w)::text FROM words w WHERE user_id = %s AND (lower(german) = %s OR lower(english) = %s) LIMIT 1",
+            (uid, term, term),
+        )
+        row = cur.fetchone()
+        cur.close()
+    return row[0] if row else None
+
+
+def _persist_word(user_id, word_id, result):
+    try:
+        with get_db() as conn:
+            cur = conn.cursor()
+            execute_prepared(
+                conn,
+                cur,
+                "EXECUTE insert_word (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                (
+                    word_id,
+                    user_id,
+                    result["english"],
+                    result["german"],
+                    result.get("word_type"),
+                    result.get("gender_article"),
+                    result.get("gender_label"),
+                    result.get("plural"),
+                    result.get("verb_forms"),
+                    result["example_sentence"],
+                    result.get("sentence_translation"),
+                    result.get("ipa"),
+                    result.get("notes"),
+                    result.get("level"),
+                    False,
+                ),
+            )
+            conn.commit()
+            cur.close()
+        # Only after the commit: invalidating earlier lets a quick follow-up
+        # GET rebuild words_cache without the new word and store that stale
+        # doc until the next mutation.
+        invalidate_user_cache(user_id)
+    except Exception:
+        app.logger.exception("background word insert failed (word_id=%s)", word_id)
 
 
 @app.route("/api/words")
 @login_required
 def get_words():
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute("SELECT * FROM words WHERE user_id = %s ORDER BY created_at DESC", (session["user_id"],))
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
-    for row in rows:
-        row["created_at"] = row["created_at"].isoformat()
-    return jsonify(rows)
+    uid = session["user_id"]
+
+    # The ETag hangs off words_cache.updated_at: every mutation — including
+    # a known-flag PATCH, which count+max(created_at) couldn't see — deletes
+    # the row, so a fresh updated_at means a genuinely changed list. On the
+    # common unchanged path the 304 costs a single primary-key lookup.
+    #
+    # No in-process layer on top: SimpleCache is per-worker, so with two
+    # gunicorn workers a mutation routed to one process left the other
+    # serving its stale copy for the full timeout. The words_cache doc is in
+    # Postgres and therefore consistent across workers.
+    with get_db() as conn:
+        cur = conn.cursor()
+        # One statement for stamp and doc: reading them separately let an
+        # invalidation (e.g. _persist_word finishing while the frontend
+        # reloads the list right after a search) delete the row between the
+        # two reads under READ COMMITTED, crashing on the empty second fetch.
+        cur.execute("SELECT updated_at, doc::text FROM words_cache WHERE user_id = %s", (uid,))
+        row = cur.fetchone()
+        if row:
+            etag = hashlib.sha1(f"{uid}:{row[0]}".encode()).hexdigest()
+            if _etag_matches(etag):
+                cur.close()
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+            doc = row[1]
+        else:
+            cur.execute("""
+                SELECT COALESCE(json_agg(row_to_json(w) ORDER BY w.created_at DESC), '[]'::json)::text
+                FROM words w WHERE user_id = %s
+            """, (uid,))
+            doc = cur.fetchone()[0]
+            cur.execute("""
+                INSERT INTO words_cache (user_id, doc) VALUES (%s, %s::jsonb)
+                ON CONFLICT (user_id) DO UPDATE SET doc = EXCLUDED.doc, updated_at = now()
+                RETURNING updated_at
+            """, (uid, doc))
+            etag = hashlib.sha1(f"{uid}:{cur.fetchone()[0]}".encode()).hexdigest()
+            conn.commit()
+        cur.close()
+
+    response = Response(doc, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
 
 @app.route("/api/words/<int:word_id>/known", methods=["PATCH"])
@@ -441,97 +952,114 @@ def get_words():
 def toggle_known(word_id):
     data = request.get_json()
     known = bool(data.get("known", False))
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("UPDATE words SET known = %s WHERE id = %s AND user_id = %s", (known, word_id, session["user_id"]))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"ok": True})
+    with get_db() as conn:
+        cur = conn.cursor()
+        execute_prepared(conn, cur, "EXECUTE set_word_known (%s, %s, %s)", (known, word_id, session["user_id"]))
+        updated = cur.fetchone()
+        conn.commit()
+        cur.close()
+    if updated is None:
+        return jout({"error": "Not found"}), 404
+    invalidate_user_cache(session["user_id"])
+    return jout({"ok": True})
 
 
 @app.route("/api/words/<int:word_id>", methods=["DELETE"])
 @login_required
 def delete_word(word_id):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM words WHERE id = %s AND user_id = %s", (word_id, session["user_id"]))
-    conn.commit()
-    cur.close()
-    conn.close()
-    return jsonify({"ok": True})
+    with get_db() as conn:
+        cur = conn.cursor()
+        execute_prepared(conn, cur, "EXECUTE delete_word_by_id (%s, %s)", (word_id, session["user_id"]))
+        deleted = cur.fetchone()
+        conn.commit()
+        cur.close()
+    if deleted is None:
+        return jout({"error": "Not found"}), 404
+    invalidate_user_cache(session["user_id"])
+    return jout({"ok": True})
+
+
+@app.route("/api/words", methods=["DELETE"])
+@login_required
+def delete_words():
+    data = request.get_json()
+    ids = data.get("ids", [])
+    if not ids or not all(isinstance(i, int) for i in ids):
+        return jout({"error": "No word ids provided"}), 400
+    with get_db() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM words WHERE user_id = %s AND id = ANY(%s)", (session["user_id"], ids))
+        deleted = cur.rowcount
+        conn.commit()
+        cur.close()
+    invalidate_user_cache(session["user_id"])
+    return jout({"ok": True, "deleted": deleted})
 
 
 @app.route("/api/stats")
 @login_required
 def get_stats():
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
     uid = session["user_id"]
+    cached = cache.get(f"stats:{uid}")
+    if cached is not None:
+        return jout(cached)
+
+    with get_db() as conn:
+        cur = conn.cursor()
+
+        # Everything in a single round trip, off a single scan of the user's
+        # rows: the w CTE is materialized once and every aggregate (and the
+        # streak's gaps-and-islands trick — day minus row number is constant
+        # within a run of consecutive days) reads from it.
+        cur.execute("""
+            WITH w AS (
+                SELECT word_type, level, known, created_at, DATE(created_at) as day
+                FROM words WHERE user_id = %(uid)s
+            ), days AS (
+                -- A streak can only extend back from today/yesterday, so a
+                -- generous cutoff keeps the window input small for old accounts.
+                SELECT DISTINCT day FROM w
+                WHERE created_at > NOW() - INTERVAL '400 days'
+            ), g AS (
+                SELECT day, day - (ROW_NUMBER() OVER (ORDER BY day))::int as grp
+                FROM days
+            )
+            SELECT json_build_object(
+                'total', (SELECT COUNT(*) FROM w),
+                'by_type', (SELECT COALESCE(json_agg(t), '[]'::json) FROM (
+                    SELECT COALESCE(word_type, 'other') as word_type, COUNT(*) as count
+                    FROM w GROUP BY word_type ORDER BY count DESC) t),
+                'known_stats', (SELECT json_build_object(
+                    'known', COUNT(*) FILTER (WHERE known = TRUE),
+                    'learning', COUNT(*) FILTER (WHERE known = FALSE OR known IS NULL))
+                    FROM w),
+                'by_level', (SELECT COALESCE(json_agg(l), '[]'::json) FROM (
+                    SELECT COALESCE(level, 'unknown') as level, COUNT(*) as count
+                    FROM w GROUP BY level ORDER BY level) l),
+                'daily', (SELECT COALESCE(json_agg(d), '[]'::json) FROM (
+                    SELECT day, COUNT(*) as count
+                    FROM w WHERE created_at > NOW() - INTERVAL '30 days'
+                    GROUP BY day ORDER BY day) d),
+                'streak', (SELECT COUNT(*) FROM g
+                    WHERE grp = (SELECT grp FROM g WHERE day IN (CURRENT_DATE, CURRENT_DATE - 1)
+                                 ORDER BY day DESC LIMIT 1))
+            )
+        """, {"uid": uid})
+        stats = cur.fetchone()[0]
+        total = stats["total"]
+        by_type = stats["by_type"]
+        known_stats = stats["known_stats"]
+        by_level = stats["by_level"]
+        daily = stats["daily"]
+        streak = stats["streak"]
+        cur.close()
 
-    # Total count
-    cur.execute("SELECT COUNT(*) as total FROM words WHERE user_id = %s", (uid,))
-    total = cur.fetchone()["total"]
-
-    # By type
-    cur.execute("SELECT COALESCE(word_type, 'other') as word_type, COUNT(*) as count FROM words WHERE user_id = %s GROUP BY word_type ORDER BY count DESC", (uid,))
-    by_type = [dict(r) for r in cur.fetchall()]
-
-    # Known vs learning
-    cur.execute("SELECT COUNT(*) FILTER (WHERE known = TRUE) as known, COUNT(*) FILTER (WHERE known = FALSE OR known IS NULL) as learning FROM words WHERE user_id = %s", (uid,))
-    known_row = cur.fetchone()
-    known_stats = {"known": known_row["known"], "learning": known_row["learning"]}
-
-    # By level
-    cur.execute("SELECT COALESCE(level, 'unknown') as level, COUNT(*) as count FROM words WHERE user_id = %s GROUP BY level ORDER BY level", (uid,))
-    by_level = [dict(r) for r in cur.fetchall()]
-
-    # Words per day (last 30 days)
-    cur.execute("""
-        SELECT DATE(created_at) as day, COUNT(*) as count
-        FROM words WHERE user_id = %s AND created_at > NOW() - INTERVAL '30 days'
-        GROUP BY DATE(created_at) ORDER BY day
-    """, (uid,))
-    daily = [{"day": r["day"].isoformat(), "count": r["count"]} for r in cur.fetchall()]
-
-    # Streak: consecutive days with at least 1 word
-    cur.execute("""
-        SELECT DISTINCT DATE(created_at) as day
-        FROM words WHERE user_id = %s ORDER BY day DESC
-    """, (uid,))
-    days = [r["day"] for r in cur.fetchall()]
-    streak = 0
-    from datetime import date, timedelta
-    today = date.today()
-    for i, d in enumerate(days):
-        expected = today - timedelta(days=i)
-        if d == expected:
-            streak += 1
-        elif i == 0 and d == today - timedelta(days=1):
-            # Allow if today has no words yet but yesterday does
-            streak += 1
-            today = today - timedelta(days=1)
-        else:
-            break
-
-    cur.close()
-    conn.close()
-
-    # Milestones
     milestones = [
-        {"target": 1, "label": "First Word", "icon": "seed"},
-        {"target": 10, "label": "Getting Started", "icon": "sprout"},
-        {"target": 25, "label": "Quarter Century", "icon": "leaf"},
-        {"target": 50, "label": "Half Century", "icon": "tree"},
-        {"target": 100, "label": "Century", "icon": "star"},
-        {"target": 250, "label": "Enthusiast", "icon": "fire"},
-        {"target": 500, "label": "Scholar", "icon": "book"},
-        {"target": 1000, "label": "Master", "icon": "crown"},
+        {"target": t, "label": label, "icon": icon, "reached": total >= t}
+        for t, label, icon in MILESTONES
     ]
-    for m in milestones:
-        m["reached"] = total >= m["target"]
 
-    return jsonify({
+    payload = {
         "total": total,
         "by_type": by_type,
         "known_stats": known_stats,
@@ -539,8 +1067,15 @@ def get_stats():
         "daily": daily,
         "streak": streak,
         "milestones": milestones,
-    })
+    }
+    # Short timeout as a backstop: the streak and daily buckets shift at
+    # midnight without any mutation happening.
+    # Short timeout: the cache is per-process, so this bounds how long a
+    # worker that didn't see the invalidating mutation can serve stale stats.
+    cache.set(f"stats:{uid}", payload, timeout=30)
+    return jout(payload)
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=8080)
+    # Local dev only; production goes through gunicorn (see Procfile).
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1", port=8080)
@@ -0,0 +1,36 @@
+"""Gunicorn configuration.
+
+The app is almost entirely network-I/O-bound (Groq, Google TTS, Postgres),
+so gevent workers let each process overlap hundreds of in-flight requests
+instead of one per thread.
+
+Patching happens here, at config load, because preload_app imports app.py
+in the master: the module-level executors and clients must be built from
+already-patched primitives, or their lazily-spawned worker threads become
+greenlets parked on unpatched C-level queues and hang the worker's only OS
+thread after the first job.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+from psycogreen.gevent import patch_psycopg
+
+patch_psycopg()
+
+worker_class = "gevent"
+workers = 2
+worker_connections = 500
+
+# Import the app (migrations, pool, Groq client, prompt constants) once in
+# the master and share it copy-on-write across workers.
+preload_app = True
+
+
+def post_fork(server, worker):
+    # The preloaded master already opened pool connections; give each worker
+    # its own so forked processes never share a socket.
+    import app
+
+    app.reset_pool()